@@ -0,0 +1,93 @@
+# Single-pass indicator kernel used by quant_core.add_indicators when numba is available
+import numpy as np
+from numba import njit, prange
+
+# EMA smoothing factors 2 / (span + 1); numba folds module globals into constants.
+A9 = np.float64(2.0 / 10.0)
+A12 = np.float64(2.0 / 13.0)
+A26 = np.float64(2.0 / 27.0)
+A50 = np.float64(2.0 / 51.0)
+A200 = np.float64(2.0 / 201.0)
+
+
+# 'contract' lets LLVM fuse e + a * (x - e) into FMA without the NaN/inf
+# assumptions of full fastmath, which the NaN warm-up values rely on.
+@njit(cache=True, fastmath={'contract'}, boundscheck=False, error_model='numpy')
+def compute_all(close, sma50, sma200, ema50, ema200, rsi, macd, sig, hist):
+    """Fill the eight indicator buffers from ``close`` in one walk over the array.
+
+    Matches the pandas definitions in quant_core: rolling-mean SMAs, EMAs with
+    ``adjust=False``, RSI(14) from rolling-mean gains/losses and MACD(12, 26, 9).
+    """
+    n = close.shape[0]
+    if n == 0:
+        return
+
+    s50 = 0.0
+    s200 = 0.0
+    e12 = close[0]
+    e26 = close[0]
+    e50 = close[0]
+    e200 = close[0]
+    es = 0.0
+
+    for i in range(n):
+        x = close[i]
+
+        # SMAs from running window sums
+        s50 += x
+        s200 += x
+        if i >= 50:
+            s50 -= close[i - 50]
+        if i >= 200:
+            s200 -= close[i - 200]
+        sma50[i] = s50 / 50.0 if i >= 49 else np.nan
+        sma200[i] = s200 / 200.0 if i >= 199 else np.nan
+
+        # EMAs, seeded with the first close
+        if i > 0:
+            e12 += A12 * (x - e12)
+            e26 += A26 * (x - e26)
+            e50 += A50 * (x - e50)
+            e200 += A200 * (x - e200)
+        ema50[i] = e50
+        ema200[i] = e200
+
+        # MACD (12,26,9)
+        m = e12 - e26
+        es = m if i == 0 else es + A9 * (m - es)
+        macd[i] = m
+        sig[i] = es
+        hist[i] = m - es
+
+        # RSI (14): the window is re-summed so flat stretches give exact zeros
+        if i < 14:
+            rsi[i] = np.nan
+            continue
+        gain = 0.0
+        loss = 0.0
+        for k in range(i - 13, i + 1):
+            d = close[k] - close[k - 1]
+            if d > 0.0:
+                gain += d
+            else:
+                loss -= d
+        # 100 - 100/(1 + g/l) == 100*g/(g + l); a flat window is 0/0 -> NaN
+        rsi[i] = 100.0 * gain / (gain + loss)
+
+
+@njit(parallel=True, cache=True, fastmath={'contract'}, boundscheck=False, error_model='numpy')
+def compute_all_batch(close, start, out):
+    """Run ``compute_all`` for every row of an (S, N) ``close`` matrix in parallel.
+
+    Rows are right-aligned: row ``s`` holds its series in ``close[s, start[s]:]``.
+    ``out`` has shape (8, S, N) in INDICATOR_COLUMNS order; only the
+    ``start[s]:`` part of each row is written.
+    """
+    for s in prange(close.shape[0]):
+        b = start[s]
+        compute_all(
+            close[s, b:],
+            out[0, s, b:], out[1, s, b:], out[2, s, b:], out[3, s, b:],
+            out[4, s, b:], out[5, s, b:], out[6, s, b:], out[7, s, b:],
+        )
@@ -1,95 +1,343 @@
 # Shared core logic used by both Streamlit and Colab
 import argparse
+import asyncio
 import ccxt
+import copy
+import functools
+import numpy as np
+import os
 import pandas as pd
-import pytz
+import pyarrow as pa
+import pyarrow.parquet as pq
+import time
 import yaml
 from datetime import datetime
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
-TZ = pytz.timezone('America/Denver')
+try:
+    from indicators_cy import compute_all  # prebuilt Cython kernel: no JIT warm-up
+except ImportError:
+    try:
+        from indicators_numba import compute_all
+    except ImportError:  # numba not installed: fall back to the pandas/scipy path
+        compute_all = None
+
+try:
+    import bottleneck as bn
+except ImportError:  # optional accelerator for the fallback path
+    bn = None
+
+TZ = ZoneInfo('America/Denver')
+MARKETS_TTL_S = 3600
+INDICATOR_COLUMNS = ['SMA50', 'SMA200', 'EMA50', 'EMA200', 'RSI', 'MACD', 'MACDSignal', 'MACDHist']
+
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml when available
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_settings(path: str, mtime_ns: int):
+    with open(path, "r", encoding="utf-8") as fh:
+        return yaml.load(fh, Loader=_YAML_LOADER)
 
 
 def load_settings(path: str | None = None):
     """Load YAML settings from conf/settings.yml."""
     if path is None:
         path = Path(__file__).resolve().parent / "conf" / "settings.yml"
-    with open(path, "r", encoding="utf-8") as fh:
-        return yaml.safe_load(fh)
+    path = str(Path(path).resolve())
+    # Re-parsed only when the file changes; callers get their own copy.
+    return copy.deepcopy(_parse_settings(path, Path(path).stat().st_mtime_ns))
 
 
-def _exchange():
-    ex = ccxt.kraken({'enableRateLimit': True})
-    ex.load_markets()
-    market = 'BTC/USD' if 'BTC/USD' in ex.symbols else 'XBT/USD'
+_markets_state = {}  # exchange id -> (monotonic load time, resolved BTC market)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_exchange(exchange_id):
+    return getattr(ccxt, exchange_id)({'enableRateLimit': True})
+
+
+def _btc_market(ex):
+    return 'BTC/USD' if 'BTC/USD' in ex.symbols else 'XBT/USD'
+
+
+def _exchange(ex=None):
+    if ex is not None:
+        ex.load_markets()  # no-op once the injected client has its markets
+        return ex, _btc_market(ex)
+
+    # Process-wide client; markets are loaded once and refreshed every MARKETS_TTL_S.
+    ex = _cached_exchange('kraken')
+    now = time.monotonic()
+    loaded_at, market = _markets_state.get(ex.id, (None, None))
+    if loaded_at is None or now - loaded_at > MARKETS_TTL_S:
+        ex.load_markets(reload=loaded_at is not None)
+        market = _btc_market(ex)
+        _markets_state[ex.id] = (now, market)
     return ex, market
 
 
-def fetch_ohlcv(timeframe='1h', limit=500):
-    ex, market = _exchange()
-    ohlcv = ex.fetch_ohlcv(market, timeframe=timeframe, limit=limit)
-    df = pd.DataFrame(ohlcv, columns=['time', 'open', 'high', 'low', 'close', 'volume'])
-    df['time'] = pd.to_datetime(df['time'], unit='ms', utc=True).dt.tz_convert(TZ)
-    df.set_index('time', inplace=True)
-    return df
+def _ohlcv_frame(ohlcv, dtype=np.float64):
+    # One float64 block straight from the row lists; ms timestamps are exact in float64.
+    arr = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+    index = pd.to_datetime(arr[:, 0].astype(np.int64), unit='ms', utc=True).tz_convert(TZ)
+    return pd.DataFrame(
+        arr[:, 1:].astype(dtype, copy=False),
+        index=index.rename('time'),
+        columns=['open', 'high', 'low', 'close', 'volume'],
+    )
+
+
+OHLCV_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _cache_path(cache_dir, ex, market, timeframe):
+    return Path(cache_dir).expanduser() / f"{ex.id}_{market.replace('/', '-')}_{timeframe}.parquet"
+
+
+def _read_cache(path):
+    """Cached rows plus the limit they were fetched for, or (None, 0)."""
+    try:
+        table = pq.read_table(path, columns=OHLCV_COLUMNS)
+    except (OSError, pa.ArrowInvalid):  # missing or unreadable: refetch in full
+        return None, 0
+    rows = np.column_stack([table[c].to_numpy().astype(np.float64) for c in OHLCV_COLUMNS])
+    return rows, int((table.schema.metadata or {}).get(b'limit', 0))
+
+
+def _write_cache(path, rows, limit):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = [pa.array(rows[:, 0].astype(np.int64))] + [pa.array(rows[:, i]) for i in range(1, 6)]
+    table = pa.Table.from_arrays(arrays, names=OHLCV_COLUMNS, metadata={'limit': str(limit)})
+    # Write then rename, so a concurrent reader never sees a half-written file.
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, path)
+
+
+def _fetch_rows_cached(ex, market, timeframe, limit, path):
+    """OHLCV rows for the last ``limit`` candles, fetching only what the cache lacks."""
+    cached, cached_limit = _read_cache(path)
+    rows = None
+    # Exchanges cap a single fetch (Kraken returns at most 720 candles), so a
+    # cache written for this limit is complete even when it holds fewer rows.
+    if cached is not None and len(cached) and (len(cached) >= limit or cached_limit >= limit):
+        # Refetch from the last cached candle, which may still have been open.
+        since = int(cached[-1, 0])
+        fresh = np.asarray(
+            ex.fetch_ohlcv(market, timeframe=timeframe, since=since, limit=limit), dtype=np.float64
+        ).reshape(-1, 6)
+        step_ms = ex.parse_timeframe(timeframe) * 1000
+        # A full page may not reach the present, and a late start leaves a gap.
+        if 0 < len(fresh) < limit and fresh[0, 0] <= since + step_ms:
+            rows = np.concatenate([cached[cached[:, 0] < fresh[0, 0]], fresh])[-limit:]
+            if cached_limit == limit and np.array_equal(rows, cached):
+                return rows  # nothing new since the last run
+    if rows is None:
+        rows = np.asarray(ex.fetch_ohlcv(market, timeframe=timeframe, limit=limit), dtype=np.float64)
+        rows = rows.reshape(-1, 6)
+    _write_cache(path, rows, limit)
+    return rows
+
+
+def fetch_ohlcv(timeframe='1h', limit=500, exchange=None, dtype=np.float64, cache_dir=None):
+    """Fetch BTC OHLCV; ``dtype=np.float32`` halves memory traffic for large limits.
+
+    With ``cache_dir`` the candles are kept in a zstd Parquet file per
+    exchange/market/timeframe and only candles newer than the cache are fetched.
+    """
+    ex, market = _exchange(exchange)
+    if cache_dir is not None:
+        path = _cache_path(cache_dir, ex, market, timeframe)
+        return _ohlcv_frame(_fetch_rows_cached(ex, market, timeframe, limit, path), dtype=dtype)
+    return _ohlcv_frame(ex.fetch_ohlcv(market, timeframe=timeframe, limit=limit), dtype=dtype)
+
+
+async def fetch_ohlcv_async(exchange, symbol, timeframe='1h', limit=500):
+    return _ohlcv_frame(await exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit))
+
+
+async def fetch_many(symbols, timeframe='1h', limit=500, exchange=None):
+    """Fetch OHLCV for several symbols concurrently; returns {symbol: DataFrame}.
+
+    Pass an open ``ccxt.async_support`` exchange to reuse it across calls made
+    on the same event loop (the client is bound to the loop it first ran on);
+    otherwise a Kraken client is created and closed around the fetch.
+    From sync code, run it with ``asyncio.run(fetch_many([...]))``.
+    """
+    import ccxt.async_support as ccxt_async  # pulls in aiohttp; only needed here
+
+    ex = exchange or ccxt_async.kraken({'enableRateLimit': True})
+    try:
+        frames = await asyncio.gather(
+            *(fetch_ohlcv_async(ex, s, timeframe=timeframe, limit=limit) for s in symbols)
+        )
+    finally:
+        if exchange is None:
+            await ex.close()
+    return dict(zip(symbols, frames))
+
+
+def _ema(x, span):
+    """EMA of a float array, identical to ``ewm(span=span, adjust=False).mean()``."""
+    from scipy.signal import lfilter  # fallback path only; scipy is slow to import
+
+    if len(x) == 0:
+        return np.array(x, dtype=float)
+    a = 2.0 / (span + 1)
+    # y[t] = a*x[t] + (1-a)*y[t-1], seeded so that y[0] == x[0].
+    y, _ = lfilter([a], [1.0, a - 1.0], x, zi=[(1.0 - a) * x[0]])
+    return y
+
+
+def _sma(x, window):
+    """Rolling mean with a full window, like ``rolling(window).mean()``."""
+    if bn is None:
+        return pd.Series(x).rolling(window).mean().to_numpy()
+    if len(x) < window:
+        return np.full(len(x), np.nan)
+    # bottleneck accumulates in the input dtype; a float32 running sum drifts.
+    return bn.move_mean(x.astype(np.float64, copy=False), window, min_count=window)
 
 
 def add_indicators(df):
-    df = df.copy()
+    # float32 input stays float32 (indicator state is still carried in float64)
+    close = df['close'].to_numpy()
+    if close.dtype != np.float32:
+        close = close.astype(np.float64, copy=False)
+    close = np.ascontiguousarray(close)  # columns of a 2-D OHLCV block are strided views
 
-    # SMAs
-    df['SMA50'] = df['close'].rolling(50).mean()
-    df['SMA200'] = df['close'].rolling(200).mean()
+    if compute_all is not None:
+        out = np.empty((len(INDICATOR_COLUMNS), len(close)), dtype=close.dtype)
+        compute_all(close, *out)
+        extra = pd.DataFrame(out.T, index=df.index, columns=INDICATOR_COLUMNS)
+        return pd.concat([df, extra], axis=1)
 
-    # EMAs
-    df['EMA50'] = df['close'].ewm(span=50, adjust=False).mean()
-    df['EMA200'] = df['close'].ewm(span=200, adjust=False).mean()
+    # SMAs
+    sma50 = _sma(close, 50)
+    sma200 = _sma(close, 200)
 
-    # RSI (14)
-    delta = df['close'].diff()
-    gain = delta.clip(lower=0).rolling(14).mean()
-    loss = (-delta.clip(upper=0)).rolling(14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    # RSI (14): gains and losses split in one pass, |d| = d for gains, -d for losses
+    d = np.diff(close, prepend=np.nan)
+    ad = np.abs(d)
+    avg_gain = _sma(0.5 * (d + ad), 14)
+    avg_loss = _sma(0.5 * (ad - d), 14)
+    # 100 - 100/(1 + g/l) == 100*g/(g + l): no loss gives 100, a flat window 0/0 = NaN
+    with np.errstate(invalid='ignore'):
+        rsi = 100 * avg_gain / (avg_gain + avg_loss)
 
     # MACD (12,26,9)
-    ema12 = df['close'].ewm(span=12, adjust=False).mean()
-    ema26 = df['close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = ema12 - ema26
-    df['MACDSignal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    df['MACDHist'] = df['MACD'] - df['MACDSignal']
+    macd = _ema(close, 12) - _ema(close, 26)
+    macd_signal = _ema(macd, 9)
+
+    extra = pd.DataFrame(
+        {
+            'SMA50': sma50,
+            'SMA200': sma200,
+            'EMA50': _ema(close, 50),
+            'EMA200': _ema(close, 200),
+            'RSI': rsi,
+            'MACD': macd,
+            'MACDSignal': macd_signal,
+            'MACDHist': macd - macd_signal,
+        },
+        index=df.index,
+        dtype=close.dtype,
+    )
+    return pd.concat([df, extra], axis=1)
+
+
+def add_indicators_many(frames):
+    """add_indicators for a ``{symbol: DataFrame}`` mapping, in one parallel kernel call.
+
+    Frames may differ in length; without numba each frame is handled on its own.
+    """
+    try:
+        # Imported here so CLI runs on the prebuilt Cython kernel never load numba.
+        from indicators_numba import compute_all_batch
+    except ImportError:
+        return {sym: add_indicators(df) for sym, df in frames.items()}
+
+    # (S, N) close matrix, each series right-aligned so the latest candles share a column
+    closes = [df['close'].to_numpy(dtype=np.float64) for df in frames.values()]
+    n = max((len(c) for c in closes), default=0)
+    start = np.array([n - len(c) for c in closes], dtype=np.int64)
+    close = np.full((len(closes), n), np.nan)
+    for row, (b, c) in enumerate(zip(start, closes)):
+        close[row, b:] = c
 
-    return df
+    out = np.empty((len(INDICATOR_COLUMNS), len(closes), n))
+    compute_all_batch(close, start, out)
+
+    result = {}
+    for row, (sym, df) in enumerate(frames.items()):
+        extra = pd.DataFrame(out[:, row, start[row]:].T, index=df.index, columns=INDICATOR_COLUMNS)
+        result[sym] = pd.concat([df, extra], axis=1)
+    return result
+
+
+def _last_row(df):
+    """Latest values of the classify_signal inputs, read without building a row Series."""
+    cols = ('SMA50', 'SMA200', 'EMA50', 'EMA200', 'RSI', 'MACD', 'MACDSignal')
+    return {c: df[c].iat[-1] for c in cols}
+
+
+# Signal code for every (bull_votes, bear_votes) pair: 1 Bullish, -1 Bearish, 0 Neutral.
+_bull, _bear = np.indices((5, 5))
+_CLASSIFY_LUT = ((_bull >= 3) & (_bull > _bear)).astype(np.int8) - ((_bear >= 3) & (_bear > _bull))
+del _bull, _bear
+SIGNAL_LABELS = ('Neutral', 'Bullish', 'Bearish')  # indexed by code, so -1 is 'Bearish'
 
 
 def classify_signal(row):
-    sma_bull = row['SMA50'] > row['SMA200']
-    sma_bear = row['SMA50'] < row['SMA200']
-    ema_bull = row['EMA50'] > row['EMA200']
-    ema_bear = row['EMA50'] < row['EMA200']
-    rsi_bull = row['RSI'] >= 50
-    rsi_bear = row['RSI'] <= 50
-    macd_bull = row['MACD'] > row['MACDSignal']
-    macd_bear = row['MACD'] < row['MACDSignal']
-
-    bull_votes = sum([sma_bull, ema_bull, rsi_bull, macd_bull])
-    bear_votes = sum([sma_bear, ema_bear, rsi_bear, macd_bear])
-
-    if bull_votes >= 3 and bull_votes > bear_votes:
-        return 'Bullish'
-    if bear_votes >= 3 and bear_votes > bull_votes:
-        return 'Bearish'
-    return 'Neutral'
-
-
-def latest_snapshot(timeframe='1h', limit=500):
-    df = add_indicators(fetch_ohlcv(timeframe, limit=limit))
-    last = df.iloc[-1]
-    sig = classify_signal(last)
+    sma50, sma200 = row['SMA50'], row['SMA200']
+    ema50, ema200 = row['EMA50'], row['EMA200']
+    rsi = row['RSI']
+    macd, macd_sig = row['MACD'], row['MACDSignal']
+
+    # int() because numpy bools add as logical OR. Bear votes are counted on
+    # their own: NaN inputs vote neither way and RSI == 50 votes both ways.
+    bull_votes = int(sma50 > sma200) + int(ema50 > ema200) + int(rsi >= 50) + int(macd > macd_sig)
+    bear_votes = int(sma50 < sma200) + int(ema50 < ema200) + int(rsi <= 50) + int(macd < macd_sig)
+    return SIGNAL_LABELS[_CLASSIFY_LUT[bull_votes, bear_votes]]
+
+
+def classify_signal_vec(df):
+    """classify_signal over every row at once: 1 Bullish, -1 Bearish, 0 Neutral (int8)."""
+    sma50, sma200 = df['SMA50'].to_numpy(), df['SMA200'].to_numpy()
+    ema50, ema200 = df['EMA50'].to_numpy(), df['EMA200'].to_numpy()
+    rsi = df['RSI'].to_numpy()
+    macd, macd_sig = df['MACD'].to_numpy(), df['MACDSignal'].to_numpy()
+
+    bull = (sma50 > sma200).astype(np.int8) + (ema50 > ema200) + (rsi >= 50) + (macd > macd_sig)
+    bear = (sma50 < sma200).astype(np.int8) + (ema50 < ema200) + (rsi <= 50) + (macd < macd_sig)
+    return _CLASSIFY_LUT[bull, bear]
+
+
+def latest_snapshot(timeframe='1h', limit=500, exchange=None, dtype=np.float64, cache_dir=None):
+    df = add_indicators(
+        fetch_ohlcv(timeframe, limit=limit, exchange=exchange, dtype=dtype, cache_dir=cache_dir)
+    )
+    sig = classify_signal(_last_row(df))
     now = datetime.now(TZ).strftime('%Y-%m-%d %H:%M:%S')
     return df, sig, now
 
 
+def latest_snapshot_multi(symbols, timeframe='1h', limit=500):
+    """latest_snapshot for several symbols: concurrent fetches, one indicator pass.
+
+    Returns ``({symbol: (df, signal)}, now)``. Each call runs its own event
+    loop with a fresh Kraken client; async callers should use fetch_many.
+    """
+    frames = asyncio.run(fetch_many(symbols, timeframe=timeframe, limit=limit))
+    frames = add_indicators_many(frames)
+    snapshots = {sym: (df, classify_signal(_last_row(df))) for sym, df in frames.items()}
+    now = datetime.now(TZ).strftime('%Y-%m-%d %H:%M:%S')
+    return snapshots, now
+
+
 def main():
     parser = argparse.ArgumentParser(description="BTC Quant CLI")
     group = parser.add_mutually_exclusive_group()
@@ -121,10 +369,11 @@ def main():
 
     timeframe = settings.get("timeframe", "1h")
     limit = settings.get("limit", 500)
+    cache_dir = settings.get("ohlcv_cache_dir")
 
     if args.live:
-        df = add_indicators(fetch_ohlcv(timeframe=timeframe, limit=limit))
-        sig = classify_signal(df.iloc[-1])
+        df = add_indicators(fetch_ohlcv(timeframe=timeframe, limit=limit, cache_dir=cache_dir))
+        sig = classify_signal(_last_row(df))
         print(sig)
         return
 
@@ -133,7 +382,7 @@ def main():
         return
 
     # Default behavior
-    df, sig, now = latest_snapshot(timeframe=timeframe, limit=limit)
+    df, sig, now = latest_snapshot(timeframe=timeframe, limit=limit, cache_dir=cache_dir)
     print(df.tail())
     print(f"Signal: {sig} at {now}")
 